@@ -1,9 +1,11 @@
 # Standard Library Imports
 import io
+import os
 import random
+import time
 from collections import Counter
 from enum import Enum
-from itertools import product
+from itertools import count, product
 from tkinter import messagebox
 
 # Third-Party Imports
@@ -19,6 +21,7 @@ from pm4py.algo.evaluation.generalization import algorithm as generalization_eva
 from pm4py.algo.evaluation.simplicity import algorithm as simplicity_evaluator
 from pm4py.objects.heuristics_net.obj import HeuristicsNet
 from pm4py.objects.log.importer.xes import importer as xes_importer
+from pm4py.objects.log.obj import EventLog
 from pm4py.statistics.attributes.log import get as log_attributes
 from pm4py.util import constants, exec_utils, xes_constants
 from pm4py.util import xes_constants as xes
@@ -27,6 +30,9 @@ from pm4py.visualization.petri_net import visualizer as pn_visualizer
 from pm4py.visualization.process_tree import visualizer as pt_visualizer
 from pm4py.objects.conversion.heuristics_net import converter as hn_converter  # new
 
+# Local Imports
+from TokenReplay import TokenReplay
+
 # Type Checking (Conditional Import)
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
@@ -38,6 +44,8 @@ class DPHM:
         # Source: Based on and abbreviated from PM4PY
         ACTIVITY_KEY = constants.PARAMETER_CONSTANT_ACTIVITY_KEY
 
+    noise_ids = count(1)  # identifies noised matrices across instances, see adopt_model
+
     def __init__(self, gui):
         self.event_log = None
         self.parameters = {}
@@ -45,9 +53,11 @@ class DPHM:
                                                        xes.DEFAULT_NAME_KEY)  # Source: PM4PY
         self.activities = None
         self.trace_list = None
+        self.variants = None
         self.df_relations = None
         self.matrix = None
         self.noised_matrix = None
+        self.noise_id: int = 0
         self.starting_activities = None
         self.ending_activities = None
 
@@ -55,27 +65,136 @@ class DPHM:
         self.net = None
         self.im = None
         self.fm = None
+        self.token_replay = None
 
         self.gamma: float = 0.01
         self.e_0: float = 0.01
         self.max_sampling_tries: int = int(max(1 / self.gamma * np.log(2 / self.e_0), 1 / (np.e * self.gamma)))
+        self.deadline: float = None  # time.monotonic() after which rejection sampling gives up
+        self.epsilon_spent: float = 0.0  # privacy budget used by this instance on the current log
+        self.log_path: str = None
+        self.epsilon_ledger: dict = {}  # path -> epsilon spent on that file, kept when another log is opened
 
-        self.GUI: GUI = gui
+        self.GUI: GUI = gui  # None for a headless instance that only holds a parsed log
 
-    def add_event_log(self, log):
+    def add_event_log(self, log) -> bool:
         try:
-            self.event_log = xes_importer.apply(log)
+            event_log = xes_importer.apply(log)
+
+            # Reopening a file continues its ledger, so that its budget cannot be reset that way
+            if self.log_path is not None:
+                self.epsilon_ledger[self.log_path] = self.epsilon_spent
+            self.log_path = os.path.abspath(log)
+            self.epsilon_spent = self.epsilon_ledger.get(self.log_path, 0.0)
+
+            self.event_log = event_log
             self.activities = None
             self.trace_list = None
+            self.variants = None
             self.df_relations = None
             self.matrix = None
             self.noised_matrix = None
+            self.noise_id = 0
             self.starting_activities = None
             self.ending_activities = None
             self.extract_activities()
+            return True
 
         except Exception as e:
+            if self.GUI is None:
+                raise
             messagebox.showerror("Error", f"Event log could not be loaded: {e}")
+            return False
+
+    def append_event_log(self, log):
+        if self.event_log is None:
+            self.add_event_log(log)
+            return
+
+        try:
+            self.append_traces(xes_importer.apply(log))  # only the new traces are parsed
+
+        except Exception as e:
+            if self.GUI is None:
+                raise
+            messagebox.showerror("Error", f"Event log could not be appended: {e}")
+
+    def append_traces(self, traces):
+        # Update the activity index, pair counts and variant multiplicities in place instead of rebuilding them
+        act_key = exec_utils.get_param_value(self.Parameters.ACTIVITY_KEY.value, parameters={},
+                                             default=xes_constants.DEFAULT_NAME_KEY)
+
+        # Read everything first, so that a malformed trace leaves the loaded log untouched
+        known_activities = set(self.activities)
+        new_activities = list()
+        updates = list()
+        for trace in traces:
+            variant = tuple(event[act_key] for event in trace)
+            for act in variant:
+                if act not in known_activities:
+                    known_activities.add(act)
+                    new_activities.append(act)
+            updates.append((trace, variant, self.get_trace_pairs(trace, act_key)))
+
+        # Copy on write: speculative workers may still be reading the current objects, see adopt_event_log
+        log = self.event_log
+        self.event_log = EventLog(list(log), attributes=log.attributes, extensions=log.extensions,
+                                  omni_present=log.omni_present, classifiers=log.classifiers,
+                                  properties=log.properties)
+        self.activities = list(self.activities)
+        self.matrix = Counter(self.matrix)
+        self.variants = Counter(self.variants)
+        self.trace_list = list(self.trace_list)
+
+        if new_activities:
+            self.extend_matrix(new_activities)
+        for trace, variant, pairs in updates:
+            self.event_log.append(trace)
+            self.variants[variant] += 1
+            self.trace_list.append(pairs)
+            for pair in pairs:
+                self.matrix[pair] += 1
+
+        # Noised counts and the subsets drawn from them depend on the whole matrix. The compiled replay of the
+        # current candidate only depends on its net and is kept.
+        self.noised_matrix = None
+        self.noise_id = 0
+        self.starting_activities = None
+        self.ending_activities = None
+
+        if self.GUI is not None:
+            self.rejection_sampling()
+
+    def extend_matrix(self, new_activities: list):
+        # Zero counts for every pair involving a new activity, so that noise is added to them as well
+        self.activities.extend(new_activities)
+        for act in new_activities:
+            for other in self.activities:
+                self.matrix.setdefault((act, other), 0)
+                self.matrix.setdefault((other, act), 0)
+            self.matrix[('0xb2e-start-0x31c', act)] = 0
+            self.matrix[(act, '0x31c-end-0x1021')] = 0
+
+    def adopt_event_log(self, other: "DPHM"):
+        # Share the parsed log and its count matrix of another instance instead of re-importing it
+        self.event_log = other.event_log
+        self.activities = other.activities
+        self.trace_list = other.trace_list
+        self.variants = other.variants
+        self.matrix = other.matrix
+
+    def adopt_model(self, other: "DPHM"):
+        # Take over the noised matrix and the candidate model of another instance on the same log
+        self.noised_matrix = other.noised_matrix
+        self.noise_id = other.noise_id
+        self.starting_activities = other.starting_activities
+        self.ending_activities = other.ending_activities
+        self.noised_heu_net = getattr(other, "noised_heu_net", None)
+        self.tree = other.tree
+        self.net = other.net
+        self.im = other.im
+        self.fm = other.fm
+        self.token_replay = other.token_replay
 
     def extract_activities(self):
         self.activities = list(
@@ -88,27 +207,33 @@ class DPHM:
 
     def get_trace_list(self):
         trace_list = list()
+        variants = Counter()
         act_key = exec_utils.get_param_value(self.Parameters.ACTIVITY_KEY.value, parameters={},
                                              default=xes_constants.DEFAULT_NAME_KEY)
         for trace in self.event_log:
-            tmp_list = list()
-            for i in range(len(trace) - 1):
-                if i == 0:  # first activity
-                    tmp_list.append(('0xb2e-start-0x31c', trace[i][act_key]))  # pre-fix a synthetic start
-                tmp_list.append((trace[i][act_key], trace[i + 1][act_key]))  # in-between activity
+            variants[tuple(event[act_key] for event in trace)] += 1  # replayed once per variant
+            trace_list.append(self.get_trace_pairs(trace, act_key))
+
+        self.trace_list = trace_list
+        self.variants = variants
+        self.create_matrix()
 
-                if i == len(trace) - 2:  # last activity
-                    tmp_list.append((trace[i + 1][act_key], '0x31c-end-0x1021'))  # post-fix a synthetic end
+    @staticmethod
+    def get_trace_pairs(trace, act_key: str) -> list:
+        tmp_list = list()
+        for i in range(len(trace) - 1):
+            if i == 0:  # first activity
+                tmp_list.append(('0xb2e-start-0x31c', trace[i][act_key]))  # pre-fix a synthetic start
+            tmp_list.append((trace[i][act_key], trace[i + 1][act_key]))  # in-between activity
 
-            if len(trace) == 1:  # consider traces of length 1
-                tmp_list.append(('0xb2e-start-0x31c', trace[0][act_key]))
-                tmp_list.append((trace[0][act_key], '0x31c-end-0x1021'))
+            if i == len(trace) - 2:  # last activity
+                tmp_list.append((trace[i + 1][act_key], '0x31c-end-0x1021'))  # post-fix a synthetic end
 
-            tmp_list = list(set(tmp_list))  # upper-bind sensitivity to 1
-            trace_list.append(tmp_list)
+        if len(trace) == 1:  # consider traces of length 1
+            tmp_list.append(('0xb2e-start-0x31c', trace[0][act_key]))
+            tmp_list.append((trace[0][act_key], '0x31c-end-0x1021'))
 
-        self.trace_list = trace_list
-        self.create_matrix()
+        return list(set(tmp_list))  # upper-bind sensitivity to 1
 
     def create_matrix(self):
         activities = sorted(self.activities, key=str.lower)
@@ -128,7 +253,8 @@ class DPHM:
             for pair in trace:
                 self.matrix[pair] += 1
 
-        self.rejection_sampling()
+        if self.GUI is not None:
+            self.rejection_sampling()
 
     def noise_matrix(self):
         if self.event_log is None:
@@ -171,6 +297,7 @@ class DPHM:
         noised_matrix = Counter(filtered_dict)
 
         self.noised_matrix = noised_matrix
+        self.noise_id = next(self.noise_ids)
         self.starting_activities = starting_activities
         self.ending_activities = ending_activities
 
@@ -221,13 +348,18 @@ class DPHM:
         if self.event_log is None:
             return False
 
+        self.epsilon_spent += self.GUI.epsilon.get()  # accounted once per run of the sampler
+
         for i in range(0, self.max_sampling_tries):
+            if self.deadline is not None and time.monotonic() > self.deadline:
+                return False
+
             # probability to stop and return nothing
             coin_flip = random.random()
             if coin_flip <= self.gamma:
                 return False
 
-            if renoise:
+            if renoise or self.noised_matrix is None:  # nothing to keep, e.g. after an append
                 self.noise_matrix()
 
             noised_heu_net = HeuristicsNet(
@@ -263,12 +395,21 @@ class DPHM:
                 self.net = n
                 self.im = im
                 self.fm = fm
+                self.token_replay = None  # compiled on first use, see get_token_replay
 
             except ValueError:
                 pass
 
             if self.check_rejection():
-                return
+                return True
+
+        return False
+
+    def get_token_replay(self) -> TokenReplay:
+        # Compile the current candidate once, and only for the attributes that replay the log
+        if self.token_replay is None:
+            self.token_replay = TokenReplay(self.net, self.im, self.fm)
+        return self.token_replay
 
     def check_rejection(self) -> bool:
             # Caching values for rejection sampling
@@ -278,7 +419,7 @@ class DPHM:
             if rej_sam_attr == "Fitness":
                 try:
                     if self.tree is not None:
-                        fitness_tb = pm4py.fitness_token_based_replay(self.event_log, self.net, self.im, self.fm)
+                        fitness_tb = self.get_token_replay().fitness(self.variants)
                         if (self.add_laplace_noise(fitness_tb.get('log_fitness'),
                                                    1, self.GUI.epsilon.get() * 0.1) >= thresh_value):
                             self.render()
@@ -290,7 +431,9 @@ class DPHM:
             elif rej_sam_attr == "Precision":
                 try:
                     if self.tree is not None:
-                        precision_tb = pm4py.precision_token_based_replay(self.event_log, self.net, self.im, self.fm)
+                        # Unlike PM4PY's ETConformance, this does not raise for nets that are not easy sound, so such
+                        # candidates get a precision value instead of being skipped
+                        precision_tb = self.get_token_replay().precision(self.variants)
                         if (self.add_laplace_noise(precision_tb,
                                                    1, self.GUI.epsilon.get() * 0.1) >= thresh_value):
                             self.render()
@@ -326,8 +469,8 @@ class DPHM:
             elif rej_sam_attr == "F1-Score":
                 try:
                     if self.tree is not None:
-                        fitness_tb = pm4py.fitness_token_based_replay(self.event_log, self.net, self.im, self.fm)
-                        precision_tb = pm4py.precision_token_based_replay(self.event_log, self.net, self.im, self.fm)
+                        fitness_tb = self.get_token_replay().fitness(self.variants)
+                        precision_tb = self.get_token_replay().precision(self.variants)
                         f1 = (fitness_tb.get('log_fitness') + precision_tb) / 2
                         if (self.add_laplace_noise(f1,
                                                    1, self.GUI.epsilon.get() * 0.1) >= thresh_value):
@@ -1,5 +1,6 @@
 # Standard Library Imports
 import os
+import threading
 import tkinter as tk
 from tkinter import filedialog, messagebox, simpledialog, ttk
 
@@ -7,7 +8,8 @@ from tkinter import filedialog, messagebox, simpledialog, ttk
 from PIL import Image, ImageTk
 
 # Local Imports
-from DPHM import DPHM
+from Speculation import Speculation
+# DPHM (and with it pm4py and the visualization stack) is imported by the warm-up thread, see warm_up()
 
 
 class GUI:
@@ -16,7 +18,7 @@ class GUI:
         self.root = tk.Tk()
         self.root.title("Differentially Private HeuristicMiner")
         self.root.geometry("1640x1240")
-        self.DPHM = DPHM(self)  # connect to Differential Private HeuristicsMiner for computation
+        self._DPHM = None  # connect to Differential Private HeuristicsMiner for computation, see DPHM property
         # self.is_loading = False
         # </editor-fold>
 
@@ -96,11 +98,13 @@ class GUI:
         self.separator3.place(x=1230, y=0, height=1240)
         # </editor-fold>
 
-        # <editor-fold desc="# File Open Button and Label">
+        # <editor-fold desc="# File Open / Append Buttons and Label">
         self.open_button = ttk.Button(self.root, text="Open File...", command=self.open_file)
         self.open_button.place(x=1280, y=10)
         self.filename_label = ttk.Label(self.root, text="")
         self.filename_label.place(x=1380, y=15)
+        self.append_button = ttk.Button(self.root, text="Append File...", command=self.append_file)
+        self.append_button.place(x=1280, y=45)
         # </editor-fold>
 
         # <editor-fold desc="# Dropdown menu for rejection sampling attribute">
@@ -204,6 +208,25 @@ class GUI:
         self.min_act_label.place(x=1470, y=480)
         # </editor-fold>
 
+        # <editor-fold desc="# Precomputation: epsilon cap input, on/off and privacy budget label">
+        self.speculation_cap = tk.DoubleVar(value=10.0)
+        self.speculation_cap_button = ttk.Button(self.root, text="Set Epsilon cap of precomputing",
+                                                 command=self.update_speculation_cap)
+        self.speculation_cap_button.place(x=1280, y=515)
+
+        self.speculation_cap_label = tk.Entry(self.root, textvariable=self.speculation_cap, state='disabled',
+                                              font=('Arial', 14), justify='center', width=10)
+        self.speculation_cap_label.place(x=1470, y=515)
+
+        self.speculate = tk.BooleanVar(value=False)
+        self.speculate_checkbox = ttk.Checkbutton(self.root, text="Precompute", variable=self.speculate,
+                                                  command=self.toggle_speculation)
+        self.speculate_checkbox.place(x=1280, y=545)
+
+        self.privacy_label = ttk.Label(self.root, text="")
+        self.privacy_label.place(x=1380, y=546)
+        # </editor-fold>
+
         # <editor-fold desc="# Separator between sliders and Save / Quit buttons">
         self.separator5 = ttk.Separator(self.root, orient="horizontal")
         self.separator5.place(x=1270, y=570, width=320)
@@ -216,6 +239,54 @@ class GUI:
         self.quit_button.place(x=1455, y=580)
         # </editor-fold>
 
+        # <editor-fold desc="# Speculative precomputation of neighbouring slider settings">
+        self.speculation = Speculation(self, enabled=self.speculate.get(), epsilon_budget=self.speculation_cap.get())
+        # </editor-fold>
+
+        # <editor-fold desc="# Background warm-up">
+        self.filename_label.config(text="Loading process mining libraries...")
+        self.warm_up_error = None
+        self.warm_up_thread = threading.Thread(target=self.warm_up, daemon=True)
+        self.warm_up_thread.start()
+        self.root.after(100, self.poll_warm_up)
+        # </editor-fold>
+
+    def warm_up(self):
+        """Imports DPHM with pm4py and the visualization stack in the background, without touching Tk."""
+        try:
+            import DPHM  # noqa: F401
+        except Exception as e:
+            self.warm_up_error = e  # reported by poll_warm_up in the Tk main thread
+
+    def poll_warm_up(self):
+        """Connects DPHM as soon as the warm-up thread has finished."""
+        if self.warm_up_thread.is_alive():
+            self.root.after(100, self.poll_warm_up)
+            return
+        if self.warm_up_error is not None:
+            self.filename_label.config(text="Process mining libraries could not be loaded")
+            messagebox.showerror("Error", f"Process mining libraries could not be loaded: {self.warm_up_error}")
+            self.root.destroy()
+            return
+        if self._DPHM is None:
+            self.filename_label.config(text="")
+            self.connect_DPHM()
+
+    def connect_DPHM(self):
+        """Waits for the warm-up if it is still running and connects DPHM."""
+        self.warm_up_thread.join()
+        if self.warm_up_error is not None:
+            raise RuntimeError("Process mining libraries could not be loaded") from self.warm_up_error
+        from DPHM import DPHM
+        self._DPHM = DPHM(self)
+
+    @property
+    def DPHM(self):
+        """Differentially Private HeuristicsMiner, connected on first use if the warm-up has not yet done so."""
+        if self._DPHM is None:
+            self.connect_DPHM()
+        return self._DPHM
+
     def open_file(self):
         """Opens a file dialog for .xes files and updates the label."""
         file_path = filedialog.askopenfilename(filetypes=[("XES Files", "*.xes")])
@@ -223,7 +294,24 @@ class GUI:
         if file_path:
             filename = os.path.basename(file_path)
             self.filename_label.config(text=f"{filename}")
-            self.DPHM.add_event_log(file_path)
+            self.speculation.cancel()  # the workers must not start on a log that is being replaced
+            if self.DPHM.add_event_log(file_path):
+                self.speculation.clear(self.DPHM.log_path)
+            self.update_privacy_label()
+            self.speculation.schedule()
+
+    def append_file(self):
+        """Opens a file dialog for .xes files with new traces and appends them to the loaded event log."""
+        file_path = filedialog.askopenfilename(filetypes=[("XES Files", "*.xes")])
+
+        if file_path:
+            filename = os.path.basename(file_path)
+            loaded = self.filename_label.cget("text")
+            self.filename_label.config(text=f"{loaded} + {filename}" if loaded else filename)
+            self.speculation.invalidate()
+            self.DPHM.append_event_log(file_path)
+            self.update_privacy_label()
+            self.speculation.schedule()
 
     def save_canvas(self):
         pass
@@ -233,18 +321,18 @@ class GUI:
         selected_value = self.rejection_sampling_attr.get()
         self.rejection_dropdown.set(selected_value)  # Manually update display
         self.rejection_dropdown.update()  # Force redraw
-        self.DPHM.rejection_sampling(renoise=False)
+        self.resample(renoise=False)
 
     def update_rejection_value(self, value):
         self.rejection_threshold.set(value)
-        self.DPHM.rejection_sampling(renoise=False)
+        self.resample(renoise=False)
 
     def update_min_dfg(self):
         new_value = simpledialog.askstring("Input", "Enter a new non-negative integer value:")
         if new_value is not None:
             if self.is_positive_integer(new_value):
                 self.min_dfg.set(int(new_value))
-                self.DPHM.rejection_sampling(renoise=False)
+                self.resample(renoise=False)
             else:
                 messagebox.showerror("Invalid Input", "Please enter a valid non-negative integer.")
 
@@ -253,10 +341,34 @@ class GUI:
         if new_value is not None:
             if self.is_positive_integer(new_value):
                 self.min_act.set(int(new_value))
-                self.DPHM.rejection_sampling(renoise=False)
+                self.resample(renoise=False)
             else:
                 messagebox.showerror("Invalid Input", "Please enter a valid non-negative integer.")
 
+    def update_speculation_cap(self):
+        new_value = simpledialog.askstring("Input", "Enter the total epsilon precomputing may spend on this log:")
+        if new_value is not None:
+            if self.is_positive_number(new_value):
+                self.speculation_cap.set(float(new_value))
+                self.speculation.epsilon_budget = float(new_value)
+                self.update_privacy_label()
+                self.speculation.schedule()
+            else:
+                messagebox.showerror("Invalid Input", "Please enter a valid non-negative number.")
+
+    def toggle_speculation(self):
+        """Turns precomputing of neighbouring slider settings on or off."""
+        self.speculation.enabled = self.speculate.get()
+        self.speculation.cancel()
+        self.speculation.schedule()
+
+    @staticmethod
+    def is_positive_number(value):
+        try:
+            return float(value) >= 0
+        except ValueError:
+            return False
+
     @staticmethod
     def is_positive_integer(value):
         try:
@@ -285,10 +397,31 @@ class GUI:
         self.loop2.set(value)
 
     def action_epsilon_slider(self, value):
-        self.DPHM.rejection_sampling()
+        self.resample(renoise=True)
 
     def action_slider(self, value):
-        self.DPHM.rejection_sampling(renoise=False)
+        self.resample(renoise=False)
+
+    def resample(self, renoise: bool):
+        """Shows the precomputed model for the current settings if there is one, runs rejection sampling otherwise."""
+        self.speculation.cancel()
+        entry = self.speculation.take(renoise)
+        if entry is not None:
+            self.DPHM.adopt_model(entry["worker"])
+            for canvas, img in sorted(entry["images"].items()):
+                self.apply_image(img, canvas)
+        else:
+            self.DPHM.rejection_sampling(renoise=renoise)
+        self.update_privacy_label()
+        self.speculation.schedule()
+
+    def update_privacy_label(self):
+        if self._DPHM is None:
+            return
+        own = self.DPHM.epsilon_spent
+        speculative = self.speculation.epsilon_spent
+        self.privacy_label.config(text=f"Epsilon spent: {own + speculative:.2f} "
+                                       f"(pre: {speculative:.2f}/{self.speculation.epsilon_budget:g})")
 
     def apply_image(self, img, canvas):
         """Assign an image to a specific canvas."""
@@ -0,0 +1,332 @@
+"""
+Local HTTP service around DPHM.
+
+Event logs are parsed once and kept resident together with their count matrices. Every discovery job runs in a
+process forked from the service, against a fresh DPHM instance that shares the resident log through fork, so no job
+re-imports or unpickles the XES. At most --workers jobs run at a time, in parallel; a job still running at its
+deadline is killed. Forking requires a POSIX system.
+
+Every job runs the sampler on the private log and spends its epsilon. The epsilon spent is kept per log name (also
+across reloads under the same name) and reported in /metrics; with --epsilon-cap, jobs that would exceed the cap on
+their log are refused with 403.
+
+Endpoints:
+    GET  /health                          liveness, uptime and resident logs
+    GET  /metrics                         job counters, queue occupancy and throughput
+    GET  /logs                            resident logs
+    POST /logs                            {"name": ..., "path": ...} parse and keep a log resident
+    POST /jobs                            {"log": ..., "epsilon": ..., "attribute": ..., "threshold": ..., ...}
+                                          403 once the epsilon cap of the log is reached, 503 if the queue is full
+    GET  /jobs/<id>                       job status and result summary
+    GET  /jobs/<id>/pnml                  accepted Petri net as PNML
+    GET  /jobs/<id>/images/<image>.png    accepted model rendered as PNG (see IMAGES)
+
+Usage: python Service.py --port 8765 --workers 2 --queue 16 --timeout 300 --epsilon-cap 50 --log running-example.xes
+"""
+
+# Standard Library Imports
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# PM4Py Imports
+from pm4py.objects.petri_net.exporter import exporter as pnml_exporter
+
+# Local Imports
+from DPHM import DPHM
+from Settings import Settings
+
+
+# Canvas numbers used by DPHM.render and the names under which the service returns them
+IMAGES = {1: "dependency_graph", 2: "petri_net", 3: "bpmn", 4: "process_tree"}
+
+
+class JobSettings(Settings):
+    """Settings of a service job, keeps the rendered images as PNG by name."""
+
+    def apply_image(self, img, canvas):
+        buffer = io.BytesIO()
+        img.save(buffer, format="PNG")
+        self.images[IMAGES[canvas]] = buffer.getvalue()
+
+
+def run_job(conn, resident: DPHM, settings: JobSettings, deadline: float):
+    """Runs in the forked job process and sends the status, error, PNML and images back to the service."""
+    try:
+        worker = DPHM(settings)
+        worker.adopt_event_log(resident)
+        worker.deadline = deadline  # ends the sampler gracefully between tries, the service kills it otherwise
+        if worker.rejection_sampling():
+            conn.send(("accepted", None, pnml_exporter.serialize(worker.net, worker.im, worker.fm), settings.images))
+        elif time.monotonic() > deadline:
+            conn.send(("timeout", None, None, {}))
+        else:
+            conn.send(("rejected", None, None, {}))  # the sampler stopped without releasing a model
+
+    except Exception as e:
+        conn.send(("failed", str(e), None, {}))
+
+    finally:
+        conn.close()
+
+
+class Job:
+    def __init__(self, log: str, settings: JobSettings, timeout: float):
+        self.id = uuid.uuid4().hex
+        self.log = log
+        self.settings = settings
+        self.status = "queued"  # queued -> running -> accepted | rejected | timeout | failed
+        self.error = None
+        self.pnml = None
+        self.submitted = time.monotonic()
+        self.deadline = self.submitted + timeout
+        self.started = None
+        self.finished = None
+
+    def summary(self) -> dict:
+        summary = {"id": self.id, "log": self.log, "status": self.status, "error": self.error,
+                   "images": sorted(self.settings.images)}
+        if self.finished is not None:
+            summary["queue_seconds"] = round((self.started or self.finished) - self.submitted, 3)
+            summary["run_seconds"] = round(self.finished - (self.started or self.finished), 3)
+        return summary
+
+
+class Service:
+    def __init__(self, workers: int = 2, queue_size: int = 16, timeout: float = 300.0, kept_jobs: int = 256,
+                 epsilon_cap: float = None):
+        self.logs = {}  # name -> headless DPHM holding the parsed log and its count matrix
+        self.epsilon_spent = {}  # name -> epsilon spent by the jobs on that log
+        self.epsilon_cap = epsilon_cap  # per log, None for no limit
+        self.jobs = OrderedDict()
+        self.kept_jobs = kept_jobs
+        self.timeout = timeout
+        self.workers = workers
+        self.queue_size = queue_size
+        self.pool = ThreadPoolExecutor(max_workers=workers)  # each thread supervises one job process
+        self.context = multiprocessing.get_context("fork")
+        self.slots = threading.BoundedSemaphore(workers + queue_size)  # running plus waiting jobs
+        self.lock = threading.Lock()
+
+        self.started = time.monotonic()
+        self.counters = {"submitted": 0, "rejected_full": 0, "rejected_epsilon": 0,
+                         "accepted": 0, "rejected": 0, "timeout": 0, "failed": 0}
+        self.running = 0
+        self.busy_seconds = 0.0
+
+    # <editor-fold desc="# Logs">
+    def load_log(self, name: str, path: str):
+        resident = DPHM(None)
+        resident.add_event_log(path)
+        with self.lock:
+            self.logs[name] = resident
+            self.epsilon_spent.setdefault(name, 0.0)  # a reload under the same name keeps its ledger
+
+    def log_summary(self, name: str) -> dict:
+        resident = self.logs[name]
+        return {"name": name, "traces": len(resident.event_log), "variants": len(resident.variants),
+                "activities": len(resident.activities), "epsilon_spent": round(self.epsilon_spent[name], 6)}
+    # </editor-fold>
+
+    # <editor-fold desc="# Jobs">
+    def submit(self, params: dict) -> Job:
+        log = params.get("log")
+        if log not in self.logs:
+            raise KeyError(f"unknown log: {log}")
+        timeout = min(float(params.get("timeout", self.timeout)), self.timeout)
+        job = Job(log, JobSettings(params), timeout)
+
+        epsilon = job.settings.epsilon.get()
+        with self.lock:  # checking and charging the cap is one step, concurrent requests must not both pass
+            if self.epsilon_cap is not None and self.epsilon_spent[log] + epsilon > self.epsilon_cap:
+                self.counters["rejected_epsilon"] += 1
+                raise PermissionError(f"epsilon cap of {self.epsilon_cap} reached for log {log} "
+                                      f"({self.epsilon_spent[log]} spent)")
+            if not self.slots.acquire(blocking=False):
+                self.counters["rejected_full"] += 1
+                raise OverflowError("job queue is full")
+            self.epsilon_spent[log] += epsilon  # charged on submission, refunded if the sampler never runs
+            self.counters["submitted"] += 1
+            self.jobs[job.id] = job
+            while len(self.jobs) > self.kept_jobs:
+                oldest = next(iter(self.jobs.values()))
+                if oldest.status in ("queued", "running"):
+                    break
+                self.jobs.popitem(last=False)
+        self.pool.submit(self.run, job)
+        return job
+
+    def run(self, job: Job):
+        job.started = time.monotonic()
+        with self.lock:
+            self.running += 1
+        try:
+            if job.started > job.deadline:
+                job.status = "timeout"
+                with self.lock:
+                    self.epsilon_spent[job.log] -= job.settings.epsilon.get()
+                return
+
+            job.status = "running"
+            receiver, sender = self.context.Pipe(duplex=False)
+            process = self.context.Process(target=run_job, daemon=True,
+                                           args=(sender, self.logs[job.log], job.settings, job.deadline))
+            process.start()
+            sender.close()
+            try:
+                if receiver.poll(max(0.0, job.deadline - time.monotonic())):
+                    job.status, job.error, job.pnml, job.settings.images = receiver.recv()
+                else:
+                    process.kill()  # e.g. stuck in a generalization evaluation or a rendering
+                    job.status = "timeout"
+            except EOFError:
+                job.status = "failed"
+                job.error = f"job process exited with code {process.exitcode}"
+            finally:
+                receiver.close()
+                process.join()
+
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+
+        finally:
+            job.finished = time.monotonic()
+            with self.lock:
+                self.running -= 1
+                self.counters[job.status] += 1
+                self.busy_seconds += job.finished - job.started
+            self.slots.release()
+    # </editor-fold>
+
+    # <editor-fold desc="# Health and metrics">
+    def health(self) -> dict:
+        return {"status": "ok", "uptime_seconds": round(time.monotonic() - self.started, 3),
+                "logs": sorted(self.logs), "workers": self.workers}
+
+    def metrics(self) -> dict:
+        with self.lock:
+            uptime = time.monotonic() - self.started
+            finished = sum(self.counters[k] for k in ("accepted", "rejected", "timeout", "failed"))
+            queued = sum(1 for job in self.jobs.values() if job.status == "queued")
+            return {**self.counters,
+                    "epsilon_spent": {name: round(spent, 6) for name, spent in sorted(self.epsilon_spent.items())},
+                    "epsilon_cap": self.epsilon_cap,
+                    "running": self.running,
+                    "queued": queued,
+                    "queue_capacity": self.workers + self.queue_size,
+                    "finished": finished,
+                    "jobs_per_minute": round(60 * finished / uptime, 3) if uptime > 0 else 0.0,
+                    "average_run_seconds": round(self.busy_seconds / finished, 3) if finished else 0.0,
+                    "uptime_seconds": round(uptime, 3)}
+    # </editor-fold>
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    service: Service = None
+
+    def send(self, status: int, body, content_type: str = "application/json"):
+        if content_type == "application/json":
+            body = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self):
+        parts = [part for part in self.path.split("?")[0].split("/") if part]
+
+        if parts == ["health"]:
+            return self.send(200, self.service.health())
+        if parts == ["metrics"]:
+            return self.send(200, self.service.metrics())
+        if parts == ["logs"]:
+            return self.send(200, [self.service.log_summary(name) for name in sorted(self.service.logs)])
+
+        if len(parts) >= 2 and parts[0] == "jobs":
+            job = self.service.jobs.get(parts[1])
+            if job is None:
+                return self.send(404, {"error": "unknown job"})
+            if len(parts) == 2:
+                return self.send(200, job.summary())
+            if parts[2:] == ["pnml"] and job.pnml is not None:
+                return self.send(200, job.pnml, "application/xml")
+            if len(parts) == 4 and parts[2] == "images" and parts[3].endswith(".png"):
+                image = job.settings.images.get(parts[3][:-len(".png")])
+                if image is not None:
+                    return self.send(200, image, "image/png")
+            return self.send(404, {"error": "not available", "status": job.status})
+
+        self.send(404, {"error": "not found"})
+
+    def do_POST(self):
+        try:
+            params = self.read_json()
+        except ValueError as e:
+            return self.send(400, {"error": f"invalid JSON: {e}"})
+
+        if self.path == "/logs":
+            name = params.get("name") or os.path.splitext(os.path.basename(params.get("path", "")))[0]
+            try:
+                self.service.load_log(name, params["path"])
+            except Exception as e:
+                return self.send(400, {"error": f"Event log could not be loaded: {e}"})
+            return self.send(201, self.service.log_summary(name))
+
+        if self.path == "/jobs":
+            try:
+                job = self.service.submit(params)
+            except KeyError as e:
+                return self.send(404, {"error": e.args[0]})
+            except (TypeError, ValueError) as e:
+                return self.send(400, {"error": str(e)})
+            except PermissionError as e:
+                return self.send(403, {"error": str(e)})
+            except OverflowError as e:
+                return self.send(503, {"error": str(e)})
+            return self.send(202, job.summary())
+
+        self.send(404, {"error": "not found"})
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Local DPHM discovery service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=2, help="jobs running in parallel, each in its own process")
+    parser.add_argument("--queue", type=int, default=16, help="jobs that may wait for a free worker")
+    parser.add_argument("--timeout", type=float, default=300.0, help="maximum seconds per job, including queueing")
+    parser.add_argument("--epsilon-cap", type=float, default=None,
+                        help="total epsilon the jobs on one log may spend, no limit if omitted")
+    parser.add_argument("--log", action="append", default=[], help="XES file to preload (repeatable)")
+    args = parser.parse_args()
+
+    service = Service(workers=args.workers, queue_size=args.queue, timeout=args.timeout,
+                      epsilon_cap=args.epsilon_cap)
+    for path in args.log:
+        service.load_log(os.path.splitext(os.path.basename(path))[0], path)
+        print(f"Loaded {path}")
+
+    RequestHandler.service = service
+    server = ThreadingHTTPServer((args.host, args.port), RequestHandler)
+    print(f"Serving on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.pool.shutdown(wait=False)
@@ -0,0 +1,79 @@
+"""
+Headless replacement of the GUI for DPHM instances that run outside the Tk main loop (service jobs and
+speculative precomputation). Kept free of heavy imports, so that the GUI can use it before the warm-up.
+"""
+
+# Type Checking (Conditional Import)
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from GUI import GUI as GUI
+
+
+ATTRIBUTES = ("F1-Score", "Fitness", "Precision", "Simplicity", "Generalization")
+
+
+class Variable:
+    """Stand-in for the Tk variables DPHM reads its parameters from."""
+
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+class Settings:
+    """Holds the parameters of a DPHM run and collects the rendered images by canvas number."""
+
+    def __init__(self, params: dict):
+        self.params = {
+            "epsilon": float(params.get("epsilon", 5.0)),
+            "dependency": float(params.get("dependency", -1)),
+            "and": float(params.get("and", 0.0)),
+            "pre_noise": float(params.get("pre_noise", 0.0)),
+            "loop2": float(params.get("loop2", 0.0)),
+            "min_dfg": int(params.get("min_dfg", 1)),
+            "min_act": int(params.get("min_act", 1)),
+            "attribute": params.get("attribute", "Fitness"),
+            "threshold": float(params.get("threshold", 0.0)),
+        }
+        if self.params["epsilon"] <= 0:
+            raise ValueError("epsilon must be positive")
+        if self.params["attribute"] not in ATTRIBUTES:
+            raise ValueError(f"unknown rejection sampling attribute: {self.params['attribute']}")
+
+        self.epsilon = Variable(self.params["epsilon"])
+        self.dependency = Variable(self.params["dependency"])
+        self.AND = Variable(self.params["and"])
+        self.pre_noise = Variable(self.params["pre_noise"])
+        self.loop2 = Variable(self.params["loop2"])
+        self.min_dfg = Variable(self.params["min_dfg"])
+        self.min_act = Variable(self.params["min_act"])
+        self.rejection_sampling_attr = Variable(self.params["attribute"])
+        self.rejection_threshold = Variable(self.params["threshold"])
+        self.images = {}
+
+    @classmethod
+    def from_gui(cls, gui: "GUI") -> "Settings":
+        """Snapshot of the current GUI values, must be taken in the Tk main thread."""
+        return cls({
+            "epsilon": gui.epsilon.get(),
+            "dependency": gui.dependency.get(),
+            "and": gui.AND.get(),
+            "pre_noise": gui.pre_noise.get(),
+            "loop2": gui.loop2.get(),
+            "min_dfg": gui.min_dfg.get(),
+            "min_act": gui.min_act.get(),
+            "attribute": gui.rejection_sampling_attr.get(),
+            "threshold": gui.rejection_threshold.get(),
+        })
+
+    def key(self) -> tuple:
+        # Slider values carry floating point noise, e.g. 0.30000000000000004
+        return tuple((k, round(v, 6) if isinstance(v, float) else v) for k, v in sorted(self.params.items()))
+
+    def apply_image(self, img, canvas):
+        self.images[canvas] = img
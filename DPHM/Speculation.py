@@ -0,0 +1,233 @@
+"""
+Speculative precomputation of neighbouring slider settings.
+
+While the GUI is idle, rejection sampling is run in the background for the settings one (or more) slider steps away
+from the current ones: epsilon with a fresh noised matrix, the rejection threshold and the heuristics thresholds on
+the noised matrix currently shown, just like the GUI callbacks would. The outcomes are kept in a bounded LRU cache,
+so that moving a slider to a precomputed value shows the result instantly.
+
+Every speculative run is a run of the sampler on the private log, whether its outcome is ever shown or not. Its
+epsilon is therefore charged to the privacy budget when the run starts, and shown next to the GUI's own spending.
+Speculation is off by default, and once on it never spends more than its epsilon budget on a log; both are set in the
+GUI.
+"""
+
+# Standard Library Imports
+import pickle
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Local Imports
+from Settings import Settings
+
+# Type Checking (Conditional Import)
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from DPHM import DPHM as DPHM
+    from GUI import GUI as GUI
+
+
+class Speculation:
+    # Parameter, slider of the GUI, and whether the GUI re-noises the matrix when that slider is released
+    SLIDERS = (
+        ("epsilon", "epsilon_slider", True),
+        ("threshold", "threshold_value_slider", False),
+        ("dependency", "dependency_slider", False),
+        ("and", "AND_slider", False),
+        ("pre_noise", "pre_noise_slider", False),
+        ("loop2", "loop2_slider", False),
+    )
+
+    def __init__(self, gui: "GUI", enabled: bool = False, workers: int = 1, steps: int = 1, cpu_budget: float = 30.0,
+                 memory_budget: int = 256 * 2 ** 20, max_entries: int = 32, epsilon_budget: float = 10.0,
+                 idle_delay: int = 500):
+        """
+        enabled         whether speculation runs at all
+        workers         background threads running speculative rejection sampling
+        steps           slider steps precomputed in each direction
+        cpu_budget      CPU seconds spent on speculation per idle period
+        memory_budget   bytes of rendered images kept in the cache
+        max_entries     outcomes kept in the cache
+        epsilon_budget  total epsilon speculation may spend on a log
+        idle_delay      milliseconds without interaction before speculation starts
+        """
+        self.GUI = gui
+        self.enabled = enabled
+        self.steps = steps
+        self.cpu_budget = cpu_budget
+        self.memory_budget = memory_budget
+        self.max_entries = max_entries
+        self.epsilon_budget = epsilon_budget
+        self.idle_delay = idle_delay
+
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.lock = threading.Lock()
+        self.cache = OrderedDict()  # key -> outcome of a speculative run, least recently used first
+        self.cache_bytes = 0
+        self.futures = {}  # key -> pending speculative run
+        self.running = set()  # DPHM instances of the runs in progress
+        self.generation = 0  # bumped whenever the log changes, outcomes of older runs are dropped
+        self.cancels = 0  # bumped on every interaction, runs submitted before it do not start
+        self.cpu_used = 0.0
+        self.epsilon_spent = 0.0  # on the log at log_path
+        self.log_path = None
+        self.ledger = {}  # path -> epsilon spent on that file, kept when another log is opened
+        self.after_id = None
+
+    # <editor-fold desc="# Cache">
+    @staticmethod
+    def key(settings: Settings, renoise: bool, noise_id: int) -> tuple:
+        # Runs that keep the noised matrix only apply to the matrix they started from
+        return settings.key(), None if renoise else noise_id
+
+    def take(self, renoise: bool) -> dict:
+        """Returns the precomputed outcome for the current GUI settings, if there is one."""
+        key = self.key(Settings.from_gui(self.GUI), renoise, self.GUI.DPHM.noise_id)
+        with self.lock:
+            # Kept in the cache: a slider fires its command while dragging and again when released, with the same
+            # settings, and both must show the same model without sampling again
+            entry = self.cache.get(key)
+            if entry is not None:
+                self.cache.move_to_end(key)
+        return entry
+
+    def store(self, key: tuple, entry: dict):
+        with self.lock:
+            self.cache[key] = entry
+            self.cache_bytes += entry["bytes"]
+            while self.cache and (len(self.cache) > self.max_entries or self.cache_bytes > self.memory_budget):
+                _, evicted = self.cache.popitem(last=False)
+                self.cache_bytes -= evicted["bytes"]
+
+    def clear(self, log_path: str):
+        """Drops all outcomes once another log has been loaded; the privacy ledger is kept per path, as in DPHM."""
+        self.cancel()
+        with self.lock:
+            self.generation += 1
+            self.cache.clear()
+            self.cache_bytes = 0
+            if self.log_path is not None:
+                self.ledger[self.log_path] = self.epsilon_spent
+            self.log_path = log_path
+            self.epsilon_spent = self.ledger.get(log_path, 0.0)
+
+    def invalidate(self):
+        """Drops all outcomes, e.g. when traces are appended to the log; the privacy ledger is kept."""
+        self.cancel()
+        with self.lock:
+            self.generation += 1
+            self.cache.clear()
+            self.cache_bytes = 0
+    # </editor-fold>
+
+    # <editor-fold desc="# Scheduling (Tk main thread)">
+    def cancel(self):
+        """Stops speculation as soon as the user interacts, so that the GUI gets the CPU."""
+        if self.after_id is not None:
+            self.GUI.root.after_cancel(self.after_id)
+            self.after_id = None
+        with self.lock:
+            self.cancels += 1
+            for future in self.futures.values():
+                future.cancel()
+            self.futures.clear()
+            for worker in self.running:
+                worker.deadline = 0.0  # rejection sampling gives up at its next try
+
+    def schedule(self):
+        """(Re)starts the idle timer after an interaction."""
+        if self.after_id is not None:
+            self.GUI.root.after_cancel(self.after_id)
+            self.after_id = None
+        if self.enabled:
+            self.after_id = self.GUI.root.after(self.idle_delay, self.start)
+
+    def start(self):
+        self.after_id = None
+        base = self.GUI.DPHM
+        if not self.enabled or base.event_log is None:
+            return
+
+        current = Settings.from_gui(self.GUI).params
+        with self.lock:
+            self.cpu_used = 0.0
+            generation = self.generation
+            cancels = self.cancels
+
+        for step in range(1, self.steps + 1):
+            for param, slider_name, renoise in self.SLIDERS:
+                if not renoise and base.noised_matrix is None:
+                    continue
+                slider = getattr(self.GUI, slider_name)
+                resolution = float(slider.cget("resolution"))
+                low, high = sorted((float(slider.cget("from")), float(slider.cget("to"))))
+                for direction in (-1, 1):
+                    value = round(current[param] + direction * step * resolution, 2)
+                    if not low <= value <= high:
+                        continue
+                    settings = Settings(dict(current, **{param: value}))
+                    key = self.key(settings, renoise, base.noise_id)
+                    with self.lock:
+                        if key in self.cache or key in self.futures:
+                            continue
+                        self.futures[key] = self.pool.submit(self.run, key, settings, renoise, base, generation,
+                                                         cancels)
+
+        self.poll()
+
+    def poll(self):
+        """Keeps the privacy budget shown in the GUI up to date while speculation is running."""
+        self.GUI.update_privacy_label()
+        with self.lock:
+            pending = any(not future.done() for future in self.futures.values())
+        if pending:
+            self.GUI.root.after(500, self.poll)
+    # </editor-fold>
+
+    # <editor-fold desc="# Speculative runs (worker threads)">
+    def run(self, key: tuple, settings: Settings, renoise: bool, base: "DPHM", generation: int, cancels: int):
+        with self.lock:
+            epsilon = settings.epsilon.get()
+            cpu_left = self.cpu_budget - self.cpu_used
+            over_budget = cpu_left <= 0 or self.epsilon_spent + epsilon > self.epsilon_budget
+            # The main thread may be changing base since the last interaction, so cancelled runs must not start
+            if over_budget or generation != self.generation or cancels != self.cancels:
+                self.futures.pop(key, None)
+                return
+            self.epsilon_spent += epsilon  # charged up front, whether the outcome is ever shown or not
+            worker = type(base)(settings)
+            worker.adopt_event_log(base)
+            if not renoise:
+                worker.adopt_model(base)
+            worker.deadline = time.monotonic() + cpu_left  # a single run must not overrun the CPU budget either
+            self.running.add(worker)
+
+        start = time.thread_time()
+        try:
+            released = worker.rejection_sampling(renoise=renoise)
+        except Exception:
+            # e.g. PM4PY failing on a noised candidate; the epsilon stays charged, the run is reported and dropped
+            traceback.print_exc()
+            released = False
+        finally:
+            with self.lock:
+                self.running.discard(worker)
+                self.cpu_used += time.thread_time() - start
+                self.futures.pop(key, None)
+
+        # Only released models are shown, the GUI keeps its current model otherwise
+        if not released or generation != self.generation:
+            return
+
+        # Keep what adopt_model takes over; the compiled replay is rebuilt lazily and the heuristics net is only
+        # needed for rendering, which is done
+        worker.token_replay = None
+        worker.noised_heu_net = None
+        size = sum(img.width * img.height * len(img.getbands()) for img in settings.images.values())
+        size += len(pickle.dumps((worker.noised_matrix, worker.starting_activities, worker.ending_activities,
+                                  worker.tree, worker.net, worker.im, worker.fm)))
+        self.store(key, {"worker": worker, "images": settings.images, "bytes": size})
+    # </editor-fold>
@@ -0,0 +1,352 @@
+# Standard Library Imports
+from collections import Counter
+
+# Type Checking (Conditional Import)
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from pm4py.objects.petri_net.obj import Marking, PetriNet
+
+
+class TokenReplay:
+    """Token-based replay on a Petri net compiled into integer place/transition arrays.
+
+    Follows the replay semantics of PM4PY's token-based replay (walking through hidden transitions, inserting
+    missing tokens, trying to reach the final marking through hidden transitions) and its ETConformance precision,
+    but operates on count-vector markings (tuples of ints) so that every replay step only depends on the marking
+    and the activity and can be cached across all variants of the log.
+    """
+    # Source: TechnicalParameters of PM4PY's token-based replay
+    MAX_REC_DEPTH: int = 50
+    MAX_IT_FINAL1: int = 5
+    MAX_IT_FINAL2: int = 5
+    MAX_REC_DEPTH_HIDTRANSENABL: int = 2
+
+    def __init__(self, net: "PetriNet", initial_marking: "Marking", final_marking: "Marking"):
+        # Places are indexed by name, since PM4PY visits the places of a marking in that order
+        places = sorted(net.places, key=lambda x: x.name)
+        place_index = {p: i for i, p in enumerate(places)}
+        transitions = sorted(net.transitions, key=lambda x: (str(x.name), id(x)))
+
+        self.pre = [tuple((place_index[a.source], a.weight) for a in t.in_arcs) for t in transitions]
+        self.post = [tuple((place_index[a.target], a.weight) for a in t.out_arcs) for t in transitions]
+        self.pre_sum = [sum(w for _, w in arcs) for arcs in self.pre]
+        self.post_sum = [sum(w for _, w in arcs) for arcs in self.post]
+        self.labels = [t.label for t in transitions]
+
+        self.label_transitions = {}
+        for i, label in enumerate(self.labels):
+            if label is not None:
+                self.label_transitions.setdefault(label, []).append(i)
+
+        self.consumers = [[] for _ in places]
+        self.sources = []  # transitions without input places are always enabled
+        for i, arcs in enumerate(self.pre):
+            for p, _ in arcs:
+                self.consumers[p].append(i)
+            if not arcs:
+                self.sources.append(i)
+
+        self.initial = tuple(initial_marking[p] if p in initial_marking else 0 for p in places)
+        self.final = tuple(final_marking[p] if p in final_marking else 0 for p in places)
+        self.final_places = [i for i, c in enumerate(self.final) if c > 0]
+
+        self.shortest_paths = [{} for _ in places]
+        for p in range(len(places)):
+            self.get_places_shortest_path(self.shortest_paths[p], p, (), 0)
+
+        # Every replay step is a pure function of the marking, hence cached per compiled net
+        self.step_cache = {}
+        self.final_cache = {}
+        self.visible_cache = {}
+
+    # <editor-fold desc="# Net semantics on count-vector markings">
+    def is_enabled(self, t: int, marking: tuple) -> bool:
+        for p, w in self.pre[t]:
+            if marking[p] < w:
+                return False
+        return True
+
+    def fire(self, t: int, marking: tuple) -> tuple:
+        m = list(marking)
+        for p, w in self.pre[t]:
+            m[p] -= w
+        for p, w in self.post[t]:
+            m[p] += w
+        return tuple(m)
+
+    def enabled_transitions(self, marking: tuple) -> list:
+        candidates = set(self.sources)
+        for p, c in enumerate(marking):
+            if c > 0:
+                candidates.update(self.consumers[p])
+        return sorted(t for t in candidates if self.is_enabled(t, marking))
+
+    def covers_final(self, marking: tuple) -> bool:
+        return all(marking[p] > 0 for p in self.final_places)
+    # </editor-fold>
+
+    # <editor-fold desc="# Hidden transitions">
+    def get_places_shortest_path(self, paths: dict, current: int, actual: tuple, rec_depth: int):
+        """Collects the shortest paths of hidden transitions from a place to all places it can reach."""
+        if rec_depth > self.MAX_REC_DEPTH:
+            return
+        for t in self.consumers[current]:
+            if self.labels[t] is None:
+                for p2, _ in self.post[t]:
+                    if p2 not in paths or len(actual) + 1 < len(paths[p2]):
+                        new_actual = actual + (t,)
+                        paths[p2] = new_actual
+                        self.get_places_shortest_path(paths, p2, new_actual, rec_depth + 1)
+
+    def get_hidden_paths(self, marking: tuple, targets: list) -> list:
+        """Paths of hidden transitions from the marked places to the target places, shortest first."""
+        hidden_paths = []
+        for p1, c in enumerate(marking):
+            if c > 0:
+                for p2 in targets:
+                    if p2 in self.shortest_paths[p1]:
+                        hidden_paths.append(self.shortest_paths[p1][p2])
+        return sorted(hidden_paths, key=len)
+
+    def enable_hidden_transitions(self, marking: tuple, fired: list, visited: set, hidden_paths: list, t: int):
+        j_indexes = [0] * len(hidden_paths)
+        z = 0
+        while True:
+            g = z % len(hidden_paths)
+            something_changed = False
+            for _ in range(j_indexes[g], len(hidden_paths[g])):
+                t3 = hidden_paths[g][j_indexes[g]]
+                if t3 != t and self.is_enabled(t3, marking) and t3 not in visited:
+                    marking = self.fire(t3, marking)
+                    fired.append(t3)
+                    visited.add(t3)
+                    something_changed = True
+                j_indexes[g] += 1
+                if self.is_enabled(t, marking):
+                    break
+            if self.is_enabled(t, marking) or not something_changed:
+                return marking
+            z += 1
+
+    def apply_hidden_trans(self, t: int, marking: tuple, rec_depth: int, visited: set, fired: list) -> tuple:
+        """Fires hidden transitions in order to enable transition t."""
+        if rec_depth >= self.MAX_REC_DEPTH_HIDTRANSENABL or t in visited:
+            return marking
+        visited.add(t)
+        places_with_missing = [p for p, w in self.pre[t] if marking[p] < w]
+        hidden_paths = self.get_hidden_paths(marking, places_with_missing)
+
+        if hidden_paths:
+            marking = self.enable_hidden_transitions(marking, fired, visited, hidden_paths, t)
+            if not self.is_enabled(t, marking):
+                for path in self.get_hidden_paths(marking, places_with_missing):
+                    for t4 in path:
+                        if t4 != t and t4 not in visited:
+                            if not self.is_enabled(t4, marking):
+                                marking = self.apply_hidden_trans(t4, marking, rec_depth + 1, visited, fired)
+                            if self.is_enabled(t4, marking):
+                                marking = self.fire(t4, marking)
+                                fired.append(t4)
+                                visited.add(t4)
+
+        return marking
+
+    def visible_transitions_eventually_enabled(self, marking: tuple) -> frozenset:
+        """Labels of the visible transitions enabled by the marking, possibly through hidden transitions."""
+        if marking in self.visible_cache:
+            return self.visible_cache[marking]
+
+        all_enabled = self.enabled_transitions(marking)
+        enabled_marking = {t: marking for t in all_enabled}
+        visible = set()
+        visited = set()
+        i = 0
+        while i < len(all_enabled):
+            t = all_enabled[i]
+            m = enabled_marking[t]
+            if (t, m) not in visited:
+                if self.labels[t] is not None:
+                    visible.add(self.labels[t])
+                elif self.is_enabled(t, m):
+                    new_marking = self.fire(t, m)
+                    for t2 in self.enabled_transitions(new_marking):
+                        all_enabled.append(t2)
+                        enabled_marking[t2] = new_marking
+                visited.add((t, m))
+            i += 1
+
+        visible = frozenset(visible)
+        self.visible_cache[marking] = visible
+        return visible
+    # </editor-fold>
+
+    # <editor-fold desc="# Replay">
+    def replay_event(self, marking: tuple, activity: str) -> tuple:
+        """Replays a single event, returns the new marking and the missing, consumed and produced tokens."""
+        key = (marking, activity)
+        if key in self.step_cache:
+            return self.step_cache[key]
+
+        missing = consumed = produced = 0
+        candidates = self.label_transitions.get(activity)
+        if candidates is None:  # activities not in the model are skipped
+            result = (marking, 0, 0, 0)
+        else:
+            enabled = [t for t in candidates if self.is_enabled(t, marking)]
+            t = enabled[0] if enabled else candidates[-1]
+            if not self.is_enabled(t, marking):
+                fired = []
+                new_marking = self.apply_hidden_trans(t, marking, 0, set(), fired)
+                for h in fired:
+                    consumed += self.pre_sum[h]
+                    produced += self.post_sum[h]
+                marking = new_marking
+            if not self.is_enabled(t, marking):
+                m = list(marking)
+                for p, w in self.pre[t]:
+                    if m[p] < w:
+                        missing += w - m[p]
+                        m[p] += w
+                marking = tuple(m)
+            consumed += self.pre_sum[t]
+            produced += self.post_sum[t]
+            result = (self.fire(t, marking), missing, consumed, produced)
+
+        self.step_cache[key] = result
+        return result
+
+    def reach_final_marking(self, marking: tuple) -> tuple:
+        """Tries to reach the final marking through hidden transitions."""
+        if marking in self.final_cache:
+            return self.final_cache[marking]
+
+        start = marking
+        consumed = produced = 0
+        for _ in range(self.MAX_IT_FINAL1):
+            if self.covers_final(marking):
+                break
+            for path in self.get_hidden_paths(marking, self.final_places):
+                for t in path:
+                    if self.is_enabled(t, marking):
+                        marking = self.fire(t, marking)
+                        consumed += self.pre_sum[t]
+                        produced += self.post_sum[t]
+                if self.covers_final(marking):
+                    break
+
+        if not self.covers_final(marking) and len(self.final_places) == 1:
+            sink = self.final_places[0]
+            connections_to_sink = sorted((self.shortest_paths[p][sink] for p, c in enumerate(marking)
+                                          if c > 0 and sink in self.shortest_paths[p]), key=len)
+            for _ in range(self.MAX_IT_FINAL2):
+                for path in connections_to_sink:
+                    for t in path:
+                        if not self.is_enabled(t, marking):
+                            break
+                        marking = self.fire(t, marking)
+                        consumed += self.pre_sum[t]
+                        produced += self.post_sum[t]
+
+        self.final_cache[start] = (marking, consumed, produced)
+        return self.final_cache[start]
+
+    def replay_variant(self, variant: tuple) -> tuple:
+        """Replays a variant, returns its missing, consumed, remaining and produced tokens and whether it fits."""
+        marking = self.initial
+        missing = consumed = 0
+        produced = sum(self.initial)
+        for activity in variant:
+            marking, m, c, p = self.replay_event(marking, activity)
+            missing += m
+            consumed += c
+            produced += p
+
+        marking, c, p = self.reach_final_marking(marking)
+        consumed += c + sum(self.final)
+        produced += p
+        remaining = sum(max(0, m - f) for m, f in zip(marking, self.final))
+        is_fit = missing == 0 and remaining == 0
+        missing += sum(max(0, f - m) for m, f in zip(marking, self.final))
+
+        return missing, consumed, remaining, produced, is_fit
+
+    def fitness(self, variants: Counter) -> dict:
+        """Token-based replay fitness of a log given as variants with their number of traces."""
+        no_traces = fit_traces = 0
+        sum_of_fitness = 0.0
+        total_m = total_c = total_r = total_p = 0
+        for variant, count in variants.items():
+            missing, consumed, remaining, produced, is_fit = self.replay_variant(variant)
+            if consumed > 0 and produced > 0:
+                trace_fitness = 0.5 * (1.0 - missing / consumed) + 0.5 * (1.0 - remaining / produced)
+            else:
+                trace_fitness = 1.0
+
+            no_traces += count
+            fit_traces += count if is_fit else 0
+            sum_of_fitness += trace_fitness * count
+            total_m += missing * count
+            total_c += consumed * count
+            total_r += remaining * count
+            total_p += produced * count
+
+        # Source: PM4PY's replay fitness evaluation
+        perc_fit_traces = 0.0
+        average_fitness = 0.0
+        log_fitness = 0
+        if no_traces > 0 and total_c > 0 and total_p > 0:
+            perc_fit_traces = 100.0 * fit_traces / no_traces
+            average_fitness = sum_of_fitness / no_traces
+            log_fitness = 0.5 * (1 - total_m / total_c) + 0.5 * (1 - total_r / total_p)
+        return {"perc_fit_traces": perc_fit_traces, "average_trace_fitness": average_fitness,
+                "log_fitness": log_fitness, "percentage_of_fitting_traces": perc_fit_traces}
+
+    def precision(self, variants: Counter) -> float:
+        """ETConformance precision of a log given as variants with their number of traces."""
+        # Prefix tree of the log, each node holds the marking reached by replaying its prefix
+        node_index = {}
+        node_marking = []
+        node_fit = []
+        node_count = []
+        node_next = []
+
+        for variant, count in variants.items():
+            parent = -1
+            marking = self.initial
+            fit = True
+            for i in range(1, len(variant)):
+                key = (parent, variant[i - 1])
+                node = node_index.get(key)
+                if node is None:
+                    if fit:
+                        marking, missing, _, _ = self.replay_event(marking, variant[i - 1])
+                        fit = missing == 0  # the prefix replay stops at the first non-conformance
+                    node = len(node_marking)
+                    node_index[key] = node
+                    node_marking.append(marking)
+                    node_fit.append(fit)
+                    node_count.append(0)
+                    node_next.append(set())
+                marking = node_marking[node]
+                fit = node_fit[node]
+                node_count[node] += count
+                node_next[node].add(variant[i])
+                parent = node
+
+        # The empty prefix is counted as well
+        no_traces = sum(variants.values())
+        start_activities = {variant[0] for variant in variants if variant}
+        enabled_initially = self.visible_transitions_eventually_enabled(self.initial)
+        sum_at = no_traces * len(enabled_initially)
+        sum_ee = no_traces * len(enabled_initially - start_activities)
+
+        for node in range(len(node_marking)):
+            if node_fit[node]:
+                activated = self.visible_transitions_eventually_enabled(node_marking[node])
+                sum_at += len(activated) * node_count[node]
+                sum_ee += len(activated - node_next[node]) * node_count[node]
+
+        if sum_at > 0:
+            return 1 - sum_ee / sum_at
+        return 1.0
+    # </editor-fold>
@@ -0,0 +1,108 @@
+"""
+Benchmark of the compiled token-based replay (TokenReplay) against PM4PY's token-based replay.
+
+A random process tree is played out and perturbed to obtain a noisy base log, a heuristics net is discovered on it,
+and logs of increasing size are drawn from the variants of the base log. For every size, log fitness and precision
+are computed by both implementations; PM4PY is only run up to --pm4py-max traces.
+
+The absolute differences to PM4PY are printed, and the benchmark exits with status 1 if one exceeds --tolerance.
+PM4PY breaks ties between hidden transitions in set iteration order, so its own values vary with PYTHONHASHSEED by
+about 1e-2 on some models; the default tolerance allows for that.
+
+Usage: python benchmark_replay.py --sizes 1000 10000 100000 1000000 --pm4py-max 100000 --tolerance 0.02
+"""
+
+# Standard Library Imports
+import argparse
+import random
+import sys
+import time
+from collections import Counter
+
+# Third-Party Imports
+import numpy as np
+
+# PM4Py Imports
+from pm4py.algo.discovery.heuristics import algorithm as heuristics_miner
+from pm4py.algo.evaluation.precision import algorithm as precision_evaluator
+from pm4py.algo.evaluation.replay_fitness import algorithm as replay_fitness
+from pm4py.algo.simulation.playout.process_tree import algorithm as tree_playout
+from pm4py.algo.simulation.tree_generator import algorithm as tree_generator
+from pm4py.objects.log.obj import EventLog, Trace
+
+# Local Imports
+from TokenReplay import TokenReplay
+
+
+def build_base_log(seed: int, num_traces: int) -> EventLog:
+    random.seed(seed)
+    np.random.seed(seed)
+    tree = tree_generator.apply(parameters={"min": 8, "mode": 12, "max": 16})
+    log = tree_playout.apply(tree, parameters={"num_traces": num_traces})
+
+    # Swap and drop events, so that the discovered model does not fit perfectly
+    noisy_log = EventLog()
+    for trace in log:
+        events = list(trace)
+        if random.random() < 0.3 and len(events) > 2:
+            i, j = random.randrange(len(events)), random.randrange(len(events))
+            events[i], events[j] = events[j], events[i]
+        if random.random() < 0.1 and len(events) > 1:
+            del events[random.randrange(len(events))]
+        if events:
+            noisy_log.append(Trace(events, attributes=trace.attributes))
+
+    return noisy_log
+
+
+def run(sizes: list, pm4py_max: int, seed: int, tolerance: float) -> bool:
+    base_log = build_base_log(seed, 1000)
+    net, im, fm = heuristics_miner.apply(base_log, parameters={"dependency_thresh": 0.5})
+    print(f"Model: {len(net.places)} places, {len(net.transitions)} transitions")
+    within_tolerance = True
+
+    for size in sizes:
+        sample = random.choices(range(len(base_log)), k=size)
+        variants = Counter(tuple(event["concept:name"] for event in base_log[i]) for i in sample)
+
+        start = time.perf_counter()
+        token_replay = TokenReplay(net, im, fm)
+        fitness = token_replay.fitness(variants)["log_fitness"]
+        precision = token_replay.precision(variants)
+        compiled_time = time.perf_counter() - start
+        line = (f"{size:>9} traces, {len(variants):>5} variants | compiled: {compiled_time:8.3f}s "
+                f"(fitness {fitness:.4f}, precision {precision:.4f})")
+
+        if size <= pm4py_max:
+            log = EventLog([base_log[i] for i in sample])
+            start = time.perf_counter()
+            pm4py_fitness = replay_fitness.apply(log, net, im, fm, variant=replay_fitness.Variants.TOKEN_BASED,
+                                                 parameters={"show_progress_bar": False})["log_fitness"]
+            pm4py_precision = precision_evaluator.apply(log, net, im, fm,
+                                                        variant=precision_evaluator.Variants.ETCONFORMANCE_TOKEN,
+                                                        parameters={"show_progress_bar": False})
+            pm4py_time = time.perf_counter() - start
+            fitness_diff = abs(fitness - pm4py_fitness)
+            precision_diff = abs(precision - pm4py_precision)
+            line += (f" | pm4py: {pm4py_time:8.3f}s (fitness {pm4py_fitness:.4f}, precision {pm4py_precision:.4f})"
+                     f" | diff: fitness {fitness_diff:.4f}, precision {precision_diff:.4f}"
+                     f" | speed-up: {pm4py_time / compiled_time:6.1f}x")
+            if fitness_diff > tolerance or precision_diff > tolerance:
+                within_tolerance = False
+                line += " | EXCEEDS TOLERANCE"
+
+        print(line)
+
+    return within_tolerance
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark compiled token replay against PM4PY.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000, 1000000])
+    parser.add_argument("--pm4py-max", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--tolerance", type=float, default=0.02,
+                        help="maximum absolute difference to PM4PY in fitness and precision")
+    args = parser.parse_args()
+    if not run(args.sizes, args.pm4py_max, args.seed, args.tolerance):
+        sys.exit(1)
@@ -0,0 +1,69 @@
+"""
+Benchmark of the application startup.
+
+Every run starts the GUI in a fresh interpreter, so that no module is imported yet, and records
+    first_window   seconds until the Tk window has been drawn
+    warm_up        seconds until the background warm-up (pm4py and the visualization stack) has finished
+    first_model    seconds until the given event log has been loaded and the first rejection sampling has finished
+    released       whether the first rejection sampling released a model, i.e. the canvases show one
+
+Requires a display; on headless machines run it through xvfb-run.
+
+Usage: python benchmark_startup.py running-example.xes --runs 5
+"""
+
+# Standard Library Imports
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+def child(log_path: str):
+    start = time.perf_counter()
+    from GUI import GUI
+    app = GUI()
+    app.root.update()
+    first_window = time.perf_counter() - start
+
+    app.warm_up_thread.join()
+    warm_up = time.perf_counter() - start
+
+    app.DPHM.add_event_log(log_path)  # parses the log and runs the first rejection sampling
+    app.root.update()
+    first_model = time.perf_counter() - start
+
+    print(json.dumps({"first_window": first_window, "warm_up": warm_up, "first_model": first_model,
+                      "released": app.canvas_data[4]["original_image"] is not None}))
+    app.root.destroy()
+
+
+def run(log_path: str, runs: int):
+    results = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), log_path, "--child"],
+                                cwd=os.path.dirname(os.path.abspath(__file__)),
+                                capture_output=True, text=True, check=True).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    for key in ("first_window", "warm_up", "first_model"):
+        values = [result[key] for result in results]
+        print(f"{key:>12}: median {statistics.median(values):7.3f}s, min {min(values):7.3f}s, "
+              f"max {max(values):7.3f}s")
+    print(f"{'released':>12}: {sum(result['released'] for result in results)}/{runs} runs")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark time to first window and time to first model.")
+    parser.add_argument("log", help="XES event log loaded after startup")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(os.path.abspath(args.log))
+    else:
+        run(os.path.abspath(args.log), args.runs)
@@ -0,0 +1,6 @@
+# Standard Library Imports
+import os
+import sys
+
+# The modules of DPHM import each other as top-level modules, like main.py does
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "DPHM"))
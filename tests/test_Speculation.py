@@ -0,0 +1,129 @@
+"""
+Speculative precomputation as seen from the GUI callbacks, with stand-ins for Tk and DPHM.
+"""
+
+# Third-Party Imports
+import pytest
+
+# Local Imports
+from Settings import Settings
+from Speculation import Speculation
+try:
+    from GUI import GUI
+except ImportError as e:  # tkinter or Pillow missing
+    pytest.skip(f"GUI could not be imported: {e}", allow_module_level=True)
+
+
+class Variable:
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+class Root:
+    def after(self, ms, func):
+        return None
+
+    def after_cancel(self, after_id):
+        pass
+
+
+class Base:
+    """Records the calls the GUI makes on its DPHM instance."""
+
+    def __init__(self):
+        self.event_log = None
+        self.noise_id = 3
+        self.epsilon_spent = 0.0
+        self.sampled = []
+        self.adopted = []
+
+    def rejection_sampling(self, renoise: bool = True):
+        self.sampled.append(renoise)
+        return False
+
+    def adopt_model(self, other):
+        self.adopted.append(other)
+
+
+class FakeGUI:
+    update_rejection_value = GUI.update_rejection_value
+    action_slider = GUI.action_slider
+    resample = GUI.resample
+
+    def __init__(self):
+        self.root = Root()
+        self.epsilon = Variable(5.0)
+        self.dependency = Variable(-1.0)
+        self.AND = Variable(0.0)
+        self.pre_noise = Variable(0.0)
+        self.loop2 = Variable(0.0)
+        self.min_dfg = Variable(1)
+        self.min_act = Variable(1)
+        self.rejection_sampling_attr = Variable("Fitness")
+        self.rejection_threshold = Variable(0.0)
+        self.DPHM = Base()
+        self.speculation = Speculation(self, enabled=True)
+        self.images = []
+
+    def apply_image(self, img, canvas):
+        self.images.append(canvas)
+
+    def update_privacy_label(self):
+        pass
+
+
+def precompute(gui: FakeGUI, threshold: float) -> dict:
+    settings = Settings(dict(Settings.from_gui(gui).params, threshold=threshold))
+    entry = {"worker": object(), "images": {1: "dependency graph", 4: "process tree"}, "bytes": 10}
+    gui.speculation.store(gui.speculation.key(settings, False, gui.DPHM.noise_id), entry)
+    return entry
+
+
+def test_press_drag_release_on_precomputed_threshold_does_not_sample():
+    gui = FakeGUI()
+    entry = precompute(gui, 0.01)
+
+    gui.update_rejection_value(0.01)  # Scale command while dragging
+    gui.action_slider(None)  # button release with the same settings
+
+    assert gui.DPHM.sampled == []
+    assert gui.DPHM.adopted == [entry["worker"], entry["worker"]]
+    assert gui.images == [1, 4, 1, 4]
+
+
+def test_threshold_without_precomputed_model_samples_on_the_current_matrix():
+    gui = FakeGUI()
+    precompute(gui, 0.01)
+
+    gui.update_rejection_value(0.02)
+
+    assert gui.DPHM.sampled == [False]
+    assert gui.DPHM.adopted == []
+
+
+def test_precomputed_model_of_another_noised_matrix_is_not_shown():
+    gui = FakeGUI()
+    precompute(gui, 0.01)
+    gui.DPHM.noise_id = 4
+
+    gui.update_rejection_value(0.01)
+
+    assert gui.DPHM.sampled == [False]
+
+
+def test_clear_keeps_the_ledger_per_log_path():
+    gui = FakeGUI()
+    gui.speculation.clear("/logs/a.xes")
+    gui.speculation.epsilon_spent = 4.0
+    precompute(gui, 0.01)
+
+    gui.speculation.clear("/logs/b.xes")
+    assert gui.speculation.epsilon_spent == 0.0 and not gui.speculation.cache
+    gui.speculation.clear("/logs/a.xes")
+    assert gui.speculation.epsilon_spent == 4.0
@@ -0,0 +1,103 @@
+"""
+Compiled token-based replay on small hand-built nets. The expected values were computed with PM4PY 2.2.31
+(replay_fitness TOKEN_BASED, precision ETCONFORMANCE_TOKEN) and are identical for PYTHONHASHSEED 0, 1 and 2.
+"""
+
+# Standard Library Imports
+from collections import Counter
+
+# Third-Party Imports
+import pytest
+
+# PM4Py Imports
+pytest.importorskip("pm4py")
+from pm4py.objects.petri_net.obj import Marking, PetriNet
+from pm4py.objects.petri_net.utils.petri_utils import add_arc_from_to
+
+# Local Imports
+from TokenReplay import TokenReplay
+
+
+def build(places, transitions, arcs, initial, final) -> TokenReplay:
+    net = PetriNet("net")
+    nodes = {}
+    for name in places:
+        nodes[name] = PetriNet.Place(name)
+        net.places.add(nodes[name])
+    for name, label in transitions:
+        nodes[name] = PetriNet.Transition(name, label)
+        net.transitions.add(nodes[name])
+    for source, target in arcs:
+        add_arc_from_to(nodes[source], nodes[target], net)
+    return TokenReplay(net, Marking({nodes[p]: 1 for p in initial}), Marking({nodes[p]: 1 for p in final}))
+
+
+def skip_net() -> TokenReplay:
+    # source -a-> p1 -b-> p2 -c-> sink, with a hidden transition from p1 to p2 that skips b
+    return build(["source", "p1", "p2", "sink"],
+                 [("t_a", "a"), ("t_b", "b"), ("skip", None), ("t_c", "c")],
+                 [("source", "t_a"), ("t_a", "p1"), ("p1", "t_b"), ("t_b", "p2"), ("p1", "skip"), ("skip", "p2"),
+                  ("p2", "t_c"), ("t_c", "sink")],
+                 ["source"], ["sink"])
+
+
+def parallel_net() -> TokenReplay:
+    # Hidden split into a and b in parallel, hidden join
+    return build(["source", "p1", "p2", "p3", "p4", "sink"],
+                 [("split", None), ("t_a", "a"), ("t_b", "b"), ("join", None)],
+                 [("source", "split"), ("split", "p1"), ("split", "p2"), ("p1", "t_a"), ("t_a", "p3"),
+                  ("p2", "t_b"), ("t_b", "p4"), ("p3", "join"), ("p4", "join"), ("join", "sink")],
+                 ["source"], ["sink"])
+
+
+# Net, traces, (missing, consumed, remaining, produced) per trace, log fitness, average trace fitness, precision
+CASES = {
+    "fitting": (skip_net, [("a", "b", "c")] * 3 + [("a", "c")] * 2,
+                [(0, 4, 0, 4)] * 5, 1.0, 1.0, 1.0),
+    "hidden_path": (skip_net, [("a", "c")],
+                    [(0, 4, 0, 4)], 1.0, 1.0, 0.6666666666666667),
+    "missing_token": (skip_net, [("a", "c", "c"), ("a", "b", "c")],
+                      [(1, 5, 1, 5), (0, 4, 0, 4)], 0.8888888888888888, 0.9, 1.0),
+    "missing_at_start": (skip_net, [("b", "c"), ("a", "b", "c")],
+                         [(1, 3, 1, 3), (0, 4, 0, 4)], 0.8571428571428572, 0.8333333333333334, 0.8),
+    "unknown_activity": (skip_net, [("a", "x", "c"), ("a", "b", "c")],
+                         [(0, 4, 0, 4), (0, 4, 0, 4)], 1.0, 1.0, 0.6666666666666667),
+    "unfit_prefix": (skip_net, [("a", "b", "b", "c", "c"), ("a", "b", "c")],
+                     [(1, 6, 1, 6), (0, 4, 0, 4)], 0.9, 0.9166666666666667, 0.75),
+    "parallel": (parallel_net, [("a", "b")] * 2 + [("b", "a")],
+                 [(0, 6, 0, 6)] * 3, 1.0, 1.0, 1.0),
+    "remaining_tokens": (parallel_net, [("a",), ("a", "b")],
+                         [(1, 3, 2, 4), (0, 6, 0, 6)], 0.8444444444444444, 0.7916666666666667, 0.6),
+    "parallel_missing": (parallel_net, [("a", "b", "a")],
+                         [(1, 7, 1, 7)], 0.8571428571428572, 0.8571428571428572, 0.6666666666666667),
+    "parallel_unfit_prefix": (parallel_net, [("a", "a", "b"), ("a", "b")],
+                              [(1, 7, 1, 7), (0, 6, 0, 6)], 0.9230769230769231, 0.9285714285714286,
+                              0.6666666666666667),
+}
+
+
+@pytest.mark.parametrize("name", sorted(CASES))
+def test_tokens_per_trace(name):
+    net, traces, tokens, _, _, _ = CASES[name]
+    token_replay = net()
+    assert [token_replay.replay_variant(trace)[:4] for trace in traces] == tokens
+
+
+@pytest.mark.parametrize("name", sorted(CASES))
+def test_fitness(name):
+    net, traces, _, log_fitness, average_fitness, _ = CASES[name]
+    fitness = net().fitness(Counter(traces))
+    assert fitness["log_fitness"] == pytest.approx(log_fitness, abs=1e-12)
+    assert fitness["average_trace_fitness"] == pytest.approx(average_fitness, abs=1e-12)
+
+
+@pytest.mark.parametrize("name", sorted(CASES))
+def test_precision(name):
+    net, traces, _, _, _, precision = CASES[name]
+    assert net().precision(Counter(traces)) == pytest.approx(precision, abs=1e-12)
+
+
+def test_empty_prefix_counts_escaping_start_activities():
+    # a and b are both enabled initially (through the hidden split), but the log only ever starts with a
+    assert parallel_net().precision(Counter({("a", "b"): 1})) == pytest.approx(0.6666666666666667, abs=1e-12)
+    assert parallel_net().precision(Counter({("a", "b"): 1, ("b", "a"): 1})) == pytest.approx(1.0, abs=1e-12)
@@ -0,0 +1,101 @@
+"""
+Appending traces to a loaded event log must leave DPHM in the same state as loading all traces at once.
+"""
+
+# Third-Party Imports
+import pytest
+
+# PM4Py Imports
+pm4py = pytest.importorskip("pm4py")
+from pm4py.objects.log.obj import Event, EventLog, Trace
+
+# Local Imports
+try:
+    from DPHM import DPHM
+except (ImportError, OSError) as e:  # e.g. cairosvg without libcairo
+    pytest.skip(f"DPHM could not be imported: {e}", allow_module_level=True)
+
+
+START, END = '0xb2e-start-0x31c', '0x31c-end-0x1021'
+
+A = [("a", "b", "c"), ("a", "c"), ("a", "b", "c"), ("b",)]
+B = [("a", "z", "c"), ("z",), ("a", "b", "c")]  # z is a new activity
+
+
+def event_log(traces) -> EventLog:
+    return EventLog([Trace([Event({"concept:name": activity}) for activity in trace]) for trace in traces])
+
+
+def write(tmp_path, name: str, traces) -> str:
+    path = str(tmp_path / name)
+    pm4py.write_xes(event_log(traces), path)
+    return path
+
+
+def state(dphm: DPHM) -> tuple:
+    # Pairs of a trace are deduplicated through a set, so their order carries no meaning
+    return (dict(dphm.matrix), dict(dphm.variants), [sorted(pairs) for pairs in dphm.trace_list],
+            sorted(dphm.activities), len(dphm.event_log))
+
+
+def test_append_equals_loading_everything(tmp_path):
+    appended = DPHM(None)
+    appended.add_event_log(write(tmp_path, "a.xes", A))
+    appended.append_event_log(write(tmp_path, "b.xes", B))
+
+    loaded = DPHM(None)
+    loaded.add_event_log(write(tmp_path, "ab.xes", A + B))
+
+    assert state(appended) == state(loaded)
+    assert appended.matrix[(START, "z")] == 1 and appended.matrix[("z", END)] == 1
+    assert appended.matrix[("z", "b")] == 0 and ("b", "z") in appended.matrix
+
+
+def test_append_resets_the_noised_matrix(tmp_path):
+    dphm = DPHM(None)
+    dphm.add_event_log(write(tmp_path, "a.xes", A))
+    dphm.noised_matrix, dphm.noise_id = {("a", "b"): 1}, 7
+    dphm.append_traces(event_log(B))
+    assert dphm.noised_matrix is None and dphm.noise_id == 0
+
+
+def test_malformed_append_leaves_the_log_untouched(tmp_path):
+    dphm = DPHM(None)
+    dphm.add_event_log(write(tmp_path, "a.xes", A))
+    before = state(dphm)
+
+    malformed = event_log([("a", "z", "c")])
+    malformed.append(Trace([Event({"concept:name": "a"}), Event({"lifecycle:transition": "complete"})]))
+    with pytest.raises(KeyError):
+        dphm.append_traces(malformed)
+
+    assert state(dphm) == before
+
+
+def test_reopening_a_file_continues_its_epsilon_ledger(tmp_path):
+    a, b = write(tmp_path, "a.xes", A), write(tmp_path, "b.xes", B)
+    dphm = DPHM(None)
+    dphm.add_event_log(a)
+    dphm.epsilon_spent = 3.0
+    dphm.add_event_log(b)
+    assert dphm.epsilon_spent == 0.0
+    dphm.epsilon_spent = 1.5
+    dphm.add_event_log(a)
+    assert dphm.epsilon_spent == 3.0
+
+    with pytest.raises(Exception):
+        dphm.add_event_log(str(tmp_path / "missing.xes"))
+    assert dphm.log_path == a and dphm.epsilon_spent == 3.0 and len(dphm.event_log) == len(A)
+
+
+def test_append_leaves_shared_snapshots_untouched(tmp_path):
+    dphm = DPHM(None)
+    dphm.add_event_log(write(tmp_path, "a.xes", A))
+    reader = DPHM(None)
+    reader.adopt_event_log(dphm)  # like a speculative worker
+    before = state(reader)
+
+    dphm.append_traces(event_log(B))
+
+    assert state(reader) == before
+    assert state(dphm) != before